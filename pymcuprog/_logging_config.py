@@ -0,0 +1,28 @@
+""" This file was generated from logging.yaml when pymcuprog was built """
+CONFIG = {'disable_existing_loggers': False,
+ 'formatters': {'detailed': {'format': '%(name)s - %(levelname)s - '
+                                       '%(message)s'},
+                'simple': {'format': '%(message)s'},
+                'timestamped': {'format': '%(asctime)s - %(name)s - '
+                                          '%(levelname)s - %(message)s'}},
+ 'handlers': {'console': {'class': 'logging.StreamHandler',
+                          'formatter': 'detailed',
+                          'level': 'WARNING',
+                          'stream': 'ext://sys.stdout'},
+              'debug_file_handler': {'class': 'logging.FileHandler',
+                                     'encoding': 'utf8',
+                                     'filename': 'debug.log',
+                                     'formatter': 'timestamped',
+                                     'level': 'DEBUG'},
+              'error_file_handler': {'backupCount': 20,
+                                     'class': 'logging.handlers.RotatingFileHandler',
+                                     'encoding': 'utf8',
+                                     'filename': 'errors.log',
+                                     'formatter': 'timestamped',
+                                     'level': 'ERROR',
+                                     'maxBytes': 10485760}},
+ 'loggers': {'pyedbglib': {'handlers': ['console'],
+                           'level': 'ERROR',
+                           'propagate': False}},
+ 'root': {'handlers': ['console'], 'level': 'WARNING'},
+ 'version': 1}
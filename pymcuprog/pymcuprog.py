@@ -8,89 +8,298 @@ from __future__ import print_function
 import sys
 import argparse
 import os
+import copy
+import re
 import logging
+import pickle
 from logging.config import dictConfig
 from logging import getLogger
 import textwrap
-import yaml
-try:
-    from pathlib import Path
-except ImportError:
-    from pathlib2 import Path  # python 2 backport
-
-from appdirs import user_log_dir
-from yaml.scanner import ScannerError
-
-# pymcuprog main function
-from . import pymcuprog_main
-from .pymcuprog_main import WRITE_TO_HEX_MEMORIES
+
+# Note that yaml, appdirs and the pymcuprog main function are imported where they are needed
+# to keep the startup time of the CLI down
 from .deviceinfo.memorynames import MemoryNames, MemoryNameAliases
 
+logger = getLogger(__name__)
+
+# CLI help texts
+_DESCRIPTION = textwrap.dedent('''\
+    Generic programmer of selected AVR, PIC and SAM devices
+
+    Basic actions:
+        - ping: read the device ID or signature
+        - read: read memories
+        - write: write memories
+        - erase: erase memories
+        - verify: verify memories
+    ''')
+
+# Usage examples shown after the argument help, only read when help is requested
+USAGE_EXAMPLES_FILENAME = "usage_examples.txt"
+
+# Choices for the CLI arguments
+_ACTIONS = ('ping', 'erase', 'read', 'write', 'verify', 'getvoltage', 'getsupplyvoltage',
+            'reboot-debugger', 'setsupplyvoltage', 'getusbvoltage', 'reset')
+_VERBOSITY = ('debug', 'info', 'warning', 'error', 'critical')
+_HV_MODES = ('tool-toggle-power', 'user-toggle-power', 'simple-unsafe-pulse')
+
+# Actions commonly run without any options, such invocations bypass the argument parser
+_FAST_PATH_ACTIONS = frozenset(('ping', 'erase', 'reset', 'getvoltage', 'getusbvoltage', 'reboot-debugger'))
+
+# Arguments that print version information and exit without performing any action
+_RELEASE_INFO_FLAGS = frozenset(("-R", "--release-info"))
+_VERSION_FLAGS = frozenset(("-V", "--version")) | _RELEASE_INFO_FLAGS
+
+# Numeric values of the logging level names used in the logging config and on the command line
+_LEVELS = {name: getattr(logging, name)
+           for name in ('DEBUG', 'INFO', 'WARN', 'WARNING', 'ERROR', 'FATAL', 'CRITICAL', 'NOTSET')}
+
+# Name of the file caching the parsed logging configuration, stored in the user log directory
+LOGGING_CACHE_FILENAME = "logging_config.pickle"
+# Increment when the processing of cached logging configurations changes
+LOGGING_CACHE_FORMAT = 1
+
+def _logging_cache_key(path, stat):
+    """
+    Get the key identifying a cached logging configuration
+
+    The key changes when the logging config YAML file is modified or when a different pymcuprog version,
+    which could process the configuration differently, is used.
+
+    :param path: path to the logging config YAML file
+    :param stat: os.stat_result of the logging config YAML file
+    :return: tuple to compare with the key stored in the cache
+    """
+    from .releaseinfo import VERSION
+    return (LOGGING_CACHE_FORMAT, VERSION, path, stat.st_mtime, stat.st_size)
+
+def _load_cached_logging_config(cachefile, key):
+    """
+    Load a previously parsed logging configuration from the cache file
+
+    :param cachefile: path to the cache file
+    :param key: key of the logging configuration, see _logging_cache_key
+    :return: tuple of (configfile, most verbose level in configfile) or None if the cache is missing or stale
+    """
+    try:
+        with open(cachefile, 'rb') as file:
+            cached_key, configfile, config_level = pickle.load(file)
+    except Exception: #pylint: disable=broad-except
+        # Missing, unreadable or corrupt cache is simply a cache miss
+        return None
+    if cached_key != key:
+        return None
+    return configfile, config_level
+
+def _store_cached_logging_config(cachefile, key, configfile, config_level):
+    """
+    Store a parsed logging configuration in the cache file
+
+    The file is written to a temporary file first and then moved in place so that a concurrent
+    pymcuprog invocation never sees a partially written cache.
+    """
+    tmpfile = "{}.{}.tmp".format(cachefile, os.getpid())
+    try:
+        with open(tmpfile, 'wb') as file:
+            pickle.dump((key, configfile, config_level), file, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmpfile, cachefile)
+    except OSError:
+        # Caching is only an optimization, carry on without it
+        try:
+            os.remove(tmpfile)
+        except OSError:
+            pass
+
+def _prepare_logging_config(configfile, logdir):
+    """
+    Remove unused handlers and redirect file loggers to the log directory
+
+    Handlers not attached to any logger would never emit anything, but they would still be created and
+    file handlers would still lower the root logger level, making every filtered out record more costly.
+
+    :param configfile: logging configuration dict, modified in place
+    :param logdir: directory to put log files in
+    :return: most verbose level of the root logger and the file handlers
+    """
+    handlers = configfile['handlers']
+    # Console handler is always kept as its level is set by the CLI user
+    used_handlers = {'console'}
+    used_handlers.update(configfile['root'].get('handlers', []))
+    for logger_config in configfile.get('loggers', {}).values():
+        used_handlers.update(logger_config.get('handlers', []))
+    # Handlers can forward records to other handlers, e.g. the target of a MemoryHandler or the handlers
+    # of a QueueHandler, and those must be kept as well
+    pending = list(used_handlers)
+    while pending:
+        handler = handlers.get(pending.pop(), {})
+        referenced = list(handler.get('handlers', []))
+        if handler.get('target') is not None:
+            referenced.append(handler['target'])
+        for name in referenced:
+            if name not in used_handlers:
+                used_handlers.add(name)
+                pending.append(name)
+    for name in list(handlers):
+        if name not in used_handlers:
+            del handlers[name]
+    # Root logger must be the most verbose of the ALL YAML configurations
+    most_verbose_logging = _LEVELS[configfile['root']['level']]
+    # Look through all handlers, and prepend log directory to redirect all file loggers
+    for handler in handlers.values():
+        filename = handler.get('filename')
+        # A filename key
+        if filename is not None:
+            handler['filename'] = os.path.join(logdir, filename)
+            most_verbose_logging = min(most_verbose_logging, _LEVELS[handler['level']])
+    return most_verbose_logging
+
+def _disable_unused_record_fields(configfile):
+    """
+    Stop gathering log record fields that none of the configured formatters use
+
+    Thread, process and caller information is looked up for every log record unless disabled. Only use this
+    for the configuration shipped with pymcuprog, as custom filters or handlers might use these fields too.
+
+    :param configfile: logging configuration dict
+    """
+    # The format string can be passed under any key when a formatter factory is used, so check all values
+    formats = " ".join(str(value) for formatter in configfile.get('formatters', {}).values()
+                       for value in formatter.values())
+    used_fields = set(re.findall(r'\w+', formats))
+    if used_fields.isdisjoint(('thread', 'threadName')):
+        logging.logThreads = False
+    if 'process' not in used_fields:
+        logging.logProcesses = False
+    if 'processName' not in used_fields:
+        logging.logMultiprocessing = False
+    if used_fields.isdisjoint(('pathname', 'filename', 'module', 'lineno', 'funcName')):
+        # Skips walking the stack to find the caller of each log call
+        logging._srcfile = None #pylint: disable=protected-access
+
+def _make_log_dir(logdir):
+    """
+    Create the log directory if it does not exist
+    """
+    try:
+        os.makedirs(logdir, exist_ok=True)
+    except OSError:
+        pass
+
+def _parse_logging_config(path, logdir):
+    """
+    Parse the logging config YAML file and redirect file loggers to the log directory
+
+    :param path: path to the logging config YAML file
+    :param logdir: directory to put log files in
+    :return: tuple of (configfile, most verbose level of the root logger and the file handlers) or None if
+        the YAML could not be parsed
+    """
+    import yaml
+    from yaml.scanner import ScannerError
+    # Use the libyaml backed loader when available, it is considerably faster than the pure Python one
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    # Read the whole file in one go, the loader parses an in-memory buffer faster than a file object
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        # File removed between the stat and the open
+        print("Unable to open logging config file '{}'".format(path))
+        return None
+    with file:
+        data = file.read()
+    try:
+        # Load logging configfile from yaml
+        configfile = yaml.load(data, Loader=loader)
+    except ScannerError:
+        # Error while parsing YAML
+        print("Error parsing logging config file '{}'".format(path))
+        return None
+    return configfile, _prepare_logging_config(configfile, logdir)
+
+def _load_logging_config_file(path, logdir):
+    """
+    Load a logging config YAML file, using the cached configuration if the file has not been modified
+
+    :param path: path to the logging config YAML file
+    :param logdir: directory to put log files and the cache in
+    :return: tuple of (configfile, most verbose level of the root logger and the file handlers) or None if
+        the file could not be loaded
+    """
+    # The file status tells whether the cached configuration is still valid
+    try:
+        key = _logging_cache_key(path, os.stat(path))
+    except OSError:
+        print("Unable to open logging config file '{}'".format(path))
+        return None
+    cachefile = os.path.join(logdir, LOGGING_CACHE_FILENAME)
+    parsed = _load_cached_logging_config(cachefile, key)
+    if parsed is None:
+        parsed = _parse_logging_config(path, logdir)
+        if parsed is not None:
+            # The log directory also holds the cache
+            _make_log_dir(logdir)
+            _store_cached_logging_config(cachefile, key, *parsed)
+    return parsed
+
 def setup_logging(user_requested_level=logging.WARNING, default_path='logging.yaml',
                   env_key='MICROCHIP_PYTHONTOOLS_CONFIG'):
     """
     Setup logging configuration for pymcuprog CLI
+
+    By default the configuration generated from the logging config YAML file at build time is used. A logging
+    config YAML file specified via the environment variable is parsed and cached in the user log directory.
     """
-    # Logging config YAML file can be specified via environment variable
-    value = os.getenv(env_key, None)
-    if value:
-        path = value
-    else:
-        # Otherwise use the one shipped with this application
-        path = os.path.join(os.path.dirname(__file__), default_path)
-    # Load the YAML if possible
-    if os.path.exists(path):
-        try:
-            with open(path, 'rt') as file:
-                # Load logging configfile from yaml
-                configfile = yaml.safe_load(file)
-                # File logging goes to user log directory under Microchip/modulename
-                logdir = user_log_dir(__name__, "Microchip")
-                # Look through all handlers, and prepend log directory to redirect all file loggers
-                num_file_handlers = 0
-                for handler in configfile['handlers'].keys():
-                    # A filename key
-                    if 'filename' in configfile['handlers'][handler].keys():
-                        configfile['handlers'][handler]['filename'] = os.path.join(
-                            logdir, configfile['handlers'][handler]['filename'])
-                        num_file_handlers += 1
-                # If file logging is enabled, it needs a folder
-                if num_file_handlers > 0:
-                    # Create it if it does not exist
-                    Path(logdir).mkdir(exist_ok=True, parents=True)
-                # Console logging takes granularity argument from CLI user
-                configfile['handlers']['console']['level'] = user_requested_level
-                # Root logger must be the most verbose of the ALL YAML configurations and the CLI user argument
-                most_verbose_logging = min(user_requested_level, getattr(logging, configfile['root']['level']))
-                for handler in configfile['handlers'].keys():
-                    # A filename key
-                    if 'filename' in configfile['handlers'][handler].keys():
-                        level = getattr(logging, configfile['handlers'][handler]['level'])
-                        most_verbose_logging = min(most_verbose_logging, level)
-                configfile['root']['level'] = most_verbose_logging
+    from appdirs import user_log_dir
+    try:
+        from ._logging_config import CONFIG
+    except ImportError:
+        # Not generated, fall back to parsing the YAML file shipped with this application
+        CONFIG = None
+    # File logging goes to user log directory under Microchip/modulename
+    logdir = user_log_dir(__name__, "Microchip")
+    try:
+        # Logging config YAML file can be specified via environment variable
+        value = os.getenv(env_key, None)
+        if value:
+            parsed = _load_logging_config_file(value, logdir)
+        elif CONFIG is not None:
+            # Otherwise use the configuration shipped with this application
+            configfile = copy.deepcopy(CONFIG)
+            parsed = configfile, _prepare_logging_config(configfile, logdir)
+            _disable_unused_record_fields(configfile)
+            # File logging needs a folder
+            if any('filename' in handler for handler in configfile['handlers'].values()):
+                _make_log_dir(logdir)
+        else:
+            parsed = _load_logging_config_file(os.path.join(os.path.dirname(__file__), default_path), logdir)
+        if parsed is not None:
+            configfile, config_level = parsed
+            # Console logging takes granularity argument from CLI user
+            configfile['handlers']['console']['level'] = user_requested_level
+            # Root logger must be the most verbose of the ALL YAML configurations and the CLI user argument
+            configfile['root']['level'] = min(user_requested_level, config_level)
             dictConfig(configfile)
             return
-        except ScannerError:
-            # Error while parsing YAML
-            print("Error parsing logging config file '{}'".format(path))
-        except KeyError as keyerror:
-            # Error looking for custom fields in YAML
-            print("Key {} not found in logging config file".format(keyerror))
-    else:
-        # Config specified by environment variable not found
-        print("Unable to open logging config file '{}'".format(path))
+    except KeyError as keyerror:
+        # Error looking for custom fields in YAML
+        print("Key {} not found in logging config file".format(keyerror))
 
     # If all else fails, revert to basic logging at specified level for this application
     print("Reverting to basic logging.")
     logging.basicConfig(level=user_requested_level)
 
 # Helper functions
+
+# Splits "<first>[:<second>[:...]]" literals, anything after the second field is ignored
+_LITERAL_RE = re.compile(r'([^:]*)(?::([^:]*))?')
+
 def _parse_literal(literal):
     """
     Literals can either be integers or float values.  Default is Integer
     """
-    if ":" in literal:
-        return list(map(lambda x: int(x, 0), literal.split(":")[:2]))
+    first, second = _LITERAL_RE.match(literal).groups()
+    if second is not None:
+        return [int(first, 0), int(second, 0)]
     try:
         return int(literal, 0)
     except ValueError:
@@ -100,101 +309,91 @@ def _parse_direct(literal):
     """
     Direct literals with offset can either be intergers or floats as offset:value. Offset is int.
     """
-    if ":" in literal:
+    first, second = _LITERAL_RE.match(literal).groups()
+    if second is not None:
         try:
-            return list(map(lambda x: int(x, 0), literal.split(":")[:2]))
+            return [int(first, 0), int(second, 0)]
         except ValueError:
-            return list(map(lambda x: float(x), literal.split(":")[:2]))
+            return [float(first), float(second)]
 
-def main():
+def _fast_path_arguments(argv):
     """
-    Entrypoint for installable CLI
+    Get the arguments for an invocation with nothing but a common action, without building the argument parser
 
-    Configures the CLI and parses the arguments
+    :param argv: command line arguments, excluding the program name
+    :return: argparse.Namespace with the action and default values for all options, or None if the full argument
+        parser is needed
     """
-    logger = getLogger(__name__)
-    parser = argparse.ArgumentParser(
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        description=textwrap.dedent('''\
-    Generic programmer of selected AVR, PIC and SAM devices
-
-    Basic actions:
-        - ping: read the device ID or signature
-        - read: read memories
-        - write: write memories
-        - erase: erase memories
-        - verify: verify memories
-            '''),
-        epilog=textwrap.dedent('''\
-    Usage examples:
-
-        Ping a device on a kit (checks connectivity by reading its signature):
-        - pymcuprog ping
-
-        Ping a device using Atmel-ICE (standalone debugger requires more information):
-        - pymcuprog ping -t atmelice -d atmega4809 -i updi
-
-        Program memories from a hexfile using PICkit4:
-        - pymcuprog write -t pickit4 -d atmega4809 -i updi -f myfile.hex
-
-        Read 64 bytes of flash from offset 0x80 in flash memory space:
-        - pymcuprog read -m flash -o 0x80 -b 64
-
-        Write literal values 0x01, 0x02 to EEPROM at offset 16 on a kit:
-        - pymcuprog write -m eeprom -o 16 -l 0x01 0x02
-
-        Write fuse byte 1 to 0xE0 on a kit:
-        - pymcuprog write -m fuses -o 1 -l 0xE0
-                               
-        Write more than one disjointed fuse in direct offset:value format
-        - pymcuprog write -m fuses -D 1:0xe0 -D 4:0x10 -D 8:0xf0
-
-        Erase a device on a kit:
-        - pymcuprog erase
-
-        Erase a locked device on a kit (UPDI only):
-        - pymcuprog erase --chip-erase-locked-device
-
-        Reset a device on a kit (by entering and leaving programming mode):
-        - pymcuprog reset
-
-        Read the actual (sampled) VTG voltage from a kit or debugger:
-        - pymcuprog getvoltage
-
-        Set target supply voltage on a kit (voltage provided by -l literal argument):
-        - pymcuprog setsupplyvoltage -l 3.3
-
-    SerialUPDI usage:
-
-        Serial UPDI (also known as 'pyupdi') is implemented as a tool in pymcuprog.
-        To use it:
-        - connect a resistor between a serial port adapter's RX, TX and the UPDI pin as shown in the README.md
-        - specify uart tool using the switch: '--tool uart'
-        - specify which serial port to use using the switch '--uart <serialport>'
-        - use the basic actions for accessing memories as shown above
-
-        Example:
+    if len(argv) != 1 or argv[0] not in _FAST_PATH_ACTIONS:
+        return None
+    # Must match the defaults in _create_parser
+    return argparse.Namespace(action=argv[0],
+                              device=None,
+                              packpath=None,
+                              tool=None,
+                              serialnumber=None,
+                              memory=MemoryNameAliases.ALL,
+                              offset=0,
+                              bytes=0,
+                              literal=None,
+                              direct=None,
+                              filename=None,
+                              clk=None,
+                              uart=None,
+                              interface=None,
+                              verbose="warning",
+                              version=False,
+                              release_info=False,
+                              erase=False,
+                              verify=False,
+                              timing=False,
+                              high_voltage=None,
+                              user_row_locked_device=False,
+                              chip_erase_locked_device=False)
+
+class _HelpWithUsageExamplesAction(argparse.Action):
+    """
+    Help argument action printing the usage examples after the argument help
 
-            Ping a device using serialUPDI:
-            - pymcuprog ping -t uart -u COM42 -d atmega4809
+    The usage examples are read from file only when help is actually printed
+    """
+    def __init__(self, option_strings, dest=argparse.SUPPRESS, default=argparse.SUPPRESS, help=None): #pylint: disable=redefined-builtin
+        super(_HelpWithUsageExamplesAction, self).__init__(option_strings=option_strings,
+                                                           dest=dest,
+                                                           default=default,
+                                                           nargs=0,
+                                                           help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        with open(os.path.join(os.path.dirname(__file__), USAGE_EXAMPLES_FILENAME), 'rt', encoding='utf-8') as file:
+            parser.epilog = file.read()
+        parser.print_help()
+        parser.exit()
+
+def _create_parser():
+    """
+    Create the CLI argument parser
+    """
+    from .pymcuprog_main import WRITE_TO_HEX_MEMORIES
 
-            Erase a device using serialUPDI:
-            - pymcuprog erase -t uart -u COM42 -d atmega4809
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=_DESCRIPTION,
+        add_help=False)
 
-            Program memories from a hexfile using serialUPDI:
-            - pymcuprog write -t uart -u COM42 -d atmega4809 -f myfile.hex
-            '''))
+    # Replaces the default help argument to add the usage examples only when help is printed
+    parser.add_argument("-h", "--help",
+                        action=_HelpWithUsageExamplesAction,
+                        help="show this help message and exit")
 
     parser.add_argument("action",
                         help="action to perform",
                         # This makes the action argument optional
                         # only if -V/--version or -R/release_info argument is given
-                        nargs="?" if "-V" in sys.argv or "--version" in sys.argv \
-                        or "-R"  in sys.argv or "--release-info" in sys.argv else None,
+                        nargs="?" if not _VERSION_FLAGS.isdisjoint(sys.argv) else None,
                         default="ping",
                         # nargs='?', # this makes ping the default, and -h the only way to get usage()
-                        choices=['ping', 'erase', 'read', 'write', 'verify', 'getvoltage', 'getsupplyvoltage',
-                                 'reboot-debugger', 'setsupplyvoltage', 'getusbvoltage', 'reset'])
+                        choices=_ACTIONS)
 
     # Device to program
     parser.add_argument("-d", "--device",
@@ -216,9 +415,9 @@ def main():
                         help="USB serial number of the unit to use")
 
     # Memtype
-    memtype_helpstring = "memory area to access: {}".format(MemoryNameAliases.ALL)
-    for memtype in MemoryNames.get_all():
-        memtype_helpstring += ", '{}'".format(memtype)
+    memtype_helpstring = "memory area to access: {}, {}".format(
+        MemoryNameAliases.ALL,
+        ", ".join("'{}'".format(memtype) for memtype in MemoryNames.get_all()))
     parser.add_argument("-m", "--memory",
                         type=str,
                         default=MemoryNameAliases.ALL,
@@ -267,7 +466,7 @@ def main():
                         help="Programming interface to use")
 
     parser.add_argument("-v", "--verbose",
-                        default="warning", choices=['debug', 'info', 'warning', 'error', 'critical'],
+                        default="warning", choices=_VERBOSITY,
                         help="Logging verbosity level")
 
     parser.add_argument("-V", "--version",
@@ -291,7 +490,7 @@ def main():
 
     # Ex-options
     parser.add_argument("-H", "--high-voltage",
-                        choices=['tool-toggle-power', 'user-toggle-power', 'simple-unsafe-pulse'],
+                        choices=_HV_MODES,
                         help="UPDI high-voltage activation mode")
 
     parser.add_argument("-U", "--user-row-locked-device",
@@ -302,11 +501,32 @@ def main():
                         help="Execute a Chip Erase on a locked device (UPDI devices only)",
                         action="store_true")
 
-    # Parse args
-    arguments = parser.parse_args()
+    return parser
+
+def main():
+    """
+    Entrypoint for installable CLI
+
+    Configures the CLI and parses the arguments
+    """
+    # Plain version requests don't need the argument parser nor the pymcuprog main function,
+    # version flags combined with other arguments are validated by the argument parser as usual
+    argv = sys.argv[1:]
+    if argv and _VERSION_FLAGS.issuperset(argv):
+        from .releaseinfo import print_version
+        print_version(release_info=not _RELEASE_INFO_FLAGS.isdisjoint(argv))
+        return 0
+
+    # Parse args, common invocations without any options bypass the argument parser
+    arguments = _fast_path_arguments(argv)
+    if arguments is None:
+        arguments = _create_parser().parse_args()
+
+    # pymcuprog main function
+    from . import pymcuprog_main
 
     # Setup logging
-    setup_logging(user_requested_level=getattr(logging, arguments.verbose.upper()))
+    setup_logging(user_requested_level=_LEVELS[arguments.verbose.upper()])
 
     try:
         # Call main with args
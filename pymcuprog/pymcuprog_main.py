@@ -21,13 +21,7 @@ from .utils import print_tool_info, showdata, verify_from_bin, compare
 from .hexfileutils import write_memories_to_hex, write_memory_to_hex, read_memories_from_hex
 from .pymcuprog_errors import PymcuprogNotSupportedError, PymcuprogSessionConfigError, \
     PymcuprogToolConnectionError, PymcuprogDeviceLockedError, PymcuprogError
-
-try:
-    from .version import VERSION, BUILD_DATE, COMMIT_ID
-except ImportError:
-    VERSION = "0.0.0"
-    COMMIT_ID = "N/A"
-    BUILD_DATE = "N/A"
+from .releaseinfo import print_version
 
 STATUS_SUCCESS = 0
 STATUS_FAILURE = 1
@@ -41,10 +35,7 @@ def pymcuprog(args):
     """
     logger = getLogger(__name__)
     if args.version or args.release_info:
-        print("pymcuprog version {}".format(VERSION))
-        if args.release_info:
-            print("Build date: {}".format(BUILD_DATE))
-            print("Commit ID:  {}".format(COMMIT_ID))
+        print_version(release_info=args.release_info)
         return STATUS_SUCCESS
 
     backend = Backend()
@@ -0,0 +1,25 @@
+"""
+pymcuprog release information
+
+Kept separate from the pymcuprog main function so that the CLI can print the version without loading it
+"""
+# Python 3 compatibility for Python 2
+from __future__ import print_function
+
+try:
+    from .version import VERSION, BUILD_DATE, COMMIT_ID
+except ImportError:
+    VERSION = "0.0.0"
+    COMMIT_ID = "N/A"
+    BUILD_DATE = "N/A"
+
+def print_version(release_info=False):
+    """
+    Print pymcuprog version
+
+    :param release_info: print build date and commit ID as well
+    """
+    print("pymcuprog version {}".format(VERSION))
+    if release_info:
+        print("Build date: {}".format(BUILD_DATE))
+        print("Commit ID:  {}".format(COMMIT_ID))
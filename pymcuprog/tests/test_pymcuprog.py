@@ -0,0 +1,249 @@
+# The intention is to make the test names descriptive enough to not need any docstrings for most of them
+#pylint: disable=missing-docstring
+"""
+pymcuprog CLI argument and logging setup tests
+"""
+import unittest
+import os
+import io
+import logging
+import shutil
+import tempfile
+import yaml
+
+from mock import patch
+
+from pymcuprog.pymcuprog import main, _create_parser, _fast_path_arguments, _FAST_PATH_ACTIONS
+from pymcuprog.pymcuprog import _parse_literal, _parse_direct
+from pymcuprog.pymcuprog import _prepare_logging_config, _disable_unused_record_fields
+from pymcuprog._logging_config import CONFIG
+from pymcuprog.pymcuprog import _load_logging_config_file, _parse_logging_config, LOGGING_CACHE_FILENAME
+
+class TestPymcuprogArguments(unittest.TestCase):
+    def test_fast_path_arguments_match_parser_defaults(self):
+        for action in _FAST_PATH_ACTIONS:
+            self.assertEqual(vars(_fast_path_arguments([action])), vars(_create_parser().parse_args([action])))
+
+    def test_fast_path_not_used_with_options(self):
+        self.assertIsNone(_fast_path_arguments(['ping', '-d', 'atmega4809']))
+
+    def test_fast_path_not_used_for_other_actions(self):
+        self.assertIsNone(_fast_path_arguments(['read']))
+
+    def test_fast_path_not_used_without_action(self):
+        self.assertIsNone(_fast_path_arguments([]))
+
+    @patch('pymcuprog.pymcuprog.setup_logging')
+    @patch('pymcuprog.pymcuprog_main.pymcuprog')
+    def test_main_passes_fast_path_arguments_to_pymcuprog_main(self, mock_pymcuprog, _mock_setup_logging):
+        mock_pymcuprog.return_value = 0
+        with patch('sys.argv', ['pymcuprog', 'erase']):
+            status = main()
+
+        self.assertEqual(status, 0)
+        mock_pymcuprog.assert_called_once_with(_fast_path_arguments(['erase']))
+
+    @patch('pymcuprog.pymcuprog.setup_logging')
+    @patch('pymcuprog.pymcuprog_main.pymcuprog')
+    def test_main_prints_version_without_pymcuprog_main(self, mock_pymcuprog, _mock_setup_logging):
+        with patch('sys.argv', ['pymcuprog', '-V']), patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            status = main()
+
+        self.assertEqual(status, 0)
+        self.assertIn("pymcuprog version", mock_stdout.getvalue())
+        mock_pymcuprog.assert_not_called()
+
+    def test_main_validates_arguments_given_with_version(self):
+        with patch('sys.argv', ['pymcuprog', '-V', '--bogus']), patch('sys.stderr', new_callable=io.StringIO):
+            with self.assertRaises(SystemExit) as context:
+                main()
+
+        self.assertNotEqual(context.exception.code, 0)
+
+    def test_help_prints_usage_examples_for_all_help_argument_forms(self):
+        for help_argument in ['-h', '--help', '--he', '-xh']:
+            with patch('sys.argv', ['pymcuprog', help_argument]), \
+                    patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+                with self.assertRaises(SystemExit) as context:
+                    main()
+
+            self.assertEqual(context.exception.code, 0)
+            self.assertIn("Usage examples:", mock_stdout.getvalue(), help_argument)
+
+class TestPymcuprogLiterals(unittest.TestCase):
+    def test_parse_literal_int(self):
+        self.assertEqual(_parse_literal('0x10'), 16)
+        self.assertEqual(_parse_literal('42'), 42)
+
+    def test_parse_literal_float(self):
+        self.assertEqual(_parse_literal('3.3'), 3.3)
+
+    def test_parse_literal_pair(self):
+        self.assertEqual(_parse_literal('1:0xE0'), [1, 0xE0])
+
+    def test_parse_literal_ignores_extra_fields(self):
+        self.assertEqual(_parse_literal('1:2:3'), [1, 2])
+
+    def test_parse_literal_invalid(self):
+        for literal in ['abc', '1:', ':1', '1:2.5']:
+            with self.assertRaises(ValueError, msg=literal):
+                _parse_literal(literal)
+
+    def test_parse_direct_int_pair(self):
+        self.assertEqual(_parse_direct('4:0x10'), [4, 0x10])
+
+    def test_parse_direct_float_pair(self):
+        self.assertEqual(_parse_direct('1.5:2'), [1.5, 2.0])
+
+    def test_parse_direct_ignores_extra_fields(self):
+        self.assertEqual(_parse_direct('8:0xf0:1'), [8, 0xf0])
+
+    def test_parse_direct_without_offset(self):
+        self.assertIsNone(_parse_direct('0x10'))
+
+    def test_parse_direct_invalid(self):
+        for literal in ['a:b', '1:', '1:0xZZ']:
+            with self.assertRaises(ValueError, msg=literal):
+                _parse_direct(literal)
+
+class TestPymcuprogLoggingConfig(unittest.TestCase):
+    @staticmethod
+    def _config(root_handlers, handlers):
+        return {'version': 1,
+                'handlers': handlers,
+                'root': {'level': 'WARNING', 'handlers': root_handlers}}
+
+    def test_prepare_logging_config_removes_unused_handlers(self):
+        configfile = self._config(['console'], {
+            'console': {'class': 'logging.StreamHandler', 'level': 'WARNING'},
+            'debug_file_handler': {'class': 'logging.FileHandler', 'level': 'DEBUG', 'filename': 'debug.log'}})
+
+        level = _prepare_logging_config(configfile, 'logdir')
+
+        self.assertEqual(list(configfile['handlers']), ['console'])
+        self.assertEqual(level, logging.WARNING)
+
+    def test_prepare_logging_config_accepts_level_name_aliases(self):
+        configfile = self._config(['console', 'debug_file_handler'], {
+            'console': {'class': 'logging.StreamHandler', 'level': 'WARN'},
+            'debug_file_handler': {'class': 'logging.FileHandler', 'level': 'FATAL', 'filename': 'debug.log'}})
+        configfile['root']['level'] = 'WARN'
+
+        level = _prepare_logging_config(configfile, 'logdir')
+
+        self.assertEqual(level, logging.WARNING)
+
+    def test_prepare_logging_config_keeps_handlers_used_by_named_loggers(self):
+        configfile = self._config(['console'], {
+            'console': {'class': 'logging.StreamHandler', 'level': 'WARNING'},
+            'error_file_handler': {'class': 'logging.FileHandler', 'level': 'ERROR', 'filename': 'errors.log'}})
+        configfile['loggers'] = {'pyedbglib': {'handlers': ['error_file_handler']}}
+
+        _prepare_logging_config(configfile, 'logdir')
+
+        self.assertEqual(configfile['handlers']['error_file_handler']['filename'],
+                         os.path.join('logdir', 'errors.log'))
+
+    def test_prepare_logging_config_keeps_handlers_used_by_other_handlers(self):
+        configfile = self._config(['console', 'mem'], {
+            'console': {'class': 'logging.StreamHandler', 'level': 'WARNING'},
+            'mem': {'class': 'logging.handlers.MemoryHandler', 'capacity': 10, 'target': 'queue'},
+            'queue': {'class': 'logging.handlers.QueueHandler', 'handlers': ['debug_file_handler']},
+            'debug_file_handler': {'class': 'logging.FileHandler', 'level': 'DEBUG', 'filename': 'debug.log'},
+            'unused': {'class': 'logging.StreamHandler'}})
+
+        level = _prepare_logging_config(configfile, 'logdir')
+
+        self.assertEqual(sorted(configfile['handlers']), ['console', 'debug_file_handler', 'mem', 'queue'])
+        self.assertEqual(level, logging.DEBUG)
+
+    def test_generated_logging_config_matches_logging_yaml(self):
+        # _logging_config.py is generated from logging.yaml by setup.py, run it again if this test fails
+        with open(os.path.join(os.path.dirname(__file__), '..', 'logging.yaml'), 'rb') as file:
+            self.assertEqual(CONFIG, yaml.safe_load(file.read().decode("utf-8")))
+
+class TestPymcuprogRecordFields(unittest.TestCase):
+    def setUp(self):
+        # Restore the logging module flags after each test
+        for name in ['logThreads', 'logProcesses', 'logMultiprocessing', '_srcfile']:
+            flag_patch = patch.object(logging, name, getattr(logging, name))
+            flag_patch.start()
+            self.addCleanup(flag_patch.stop)
+
+    def test_disable_unused_record_fields_disables_all_for_message_only_format(self):
+        _disable_unused_record_fields({'formatters': {'simple': {'format': '%(name)s - %(message)s'}}})
+
+        self.assertFalse(logging.logThreads)
+        self.assertFalse(logging.logProcesses)
+        self.assertFalse(logging.logMultiprocessing)
+        self.assertIsNone(logging._srcfile) #pylint: disable=protected-access
+
+    def test_disable_unused_record_fields_keeps_fields_used_in_format(self):
+        srcfile = logging._srcfile #pylint: disable=protected-access
+        _disable_unused_record_fields({'formatters': {'detailed': {'format': '%(threadName)s %(lineno)d'}}})
+
+        self.assertTrue(logging.logThreads)
+        self.assertFalse(logging.logProcesses)
+        self.assertEqual(logging._srcfile, srcfile) #pylint: disable=protected-access
+
+    def test_disable_unused_record_fields_checks_formatter_factory_arguments(self):
+        srcfile = logging._srcfile #pylint: disable=protected-access
+        _disable_unused_record_fields(
+            {'formatters': {'custom': {'()': 'logging.Formatter', 'fmt': '%(funcName)s:%(lineno)d %(message)s'}}})
+
+        self.assertEqual(logging._srcfile, srcfile) #pylint: disable=protected-access
+
+LOGGING_CONFIG_YAML = """
+version: 1
+handlers:
+  console:
+    class: logging.StreamHandler
+    level: WARNING
+root:
+  level: WARNING
+  handlers: [console]
+"""
+
+class TestPymcuprogLoggingConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.logdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.logdir)
+        self.configpath = os.path.join(self.logdir, 'logging.yaml')
+        with open(self.configpath, 'w') as file:
+            file.write(LOGGING_CONFIG_YAML)
+        parse_patch = patch('pymcuprog.pymcuprog._parse_logging_config', wraps=_parse_logging_config)
+        self.mock_parse = parse_patch.start()
+        self.addCleanup(parse_patch.stop)
+
+    def test_cache_hit_does_not_parse_yaml(self):
+        first = _load_logging_config_file(self.configpath, self.logdir)
+        second = _load_logging_config_file(self.configpath, self.logdir)
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.mock_parse.call_count, 1)
+
+    def test_cache_miss_when_config_file_modified(self):
+        _load_logging_config_file(self.configpath, self.logdir)
+        stat = os.stat(self.configpath)
+        os.utime(self.configpath, (stat.st_atime, stat.st_mtime + 10))
+
+        _load_logging_config_file(self.configpath, self.logdir)
+
+        self.assertEqual(self.mock_parse.call_count, 2)
+
+    def test_cache_miss_when_pymcuprog_version_changes(self):
+        _load_logging_config_file(self.configpath, self.logdir)
+        with patch('pymcuprog.releaseinfo.VERSION', '0.0.1'):
+            _load_logging_config_file(self.configpath, self.logdir)
+
+        self.assertEqual(self.mock_parse.call_count, 2)
+
+    def test_corrupt_cache_is_replaced(self):
+        with open(os.path.join(self.logdir, LOGGING_CACHE_FILENAME), 'wb') as file:
+            file.write(b'not a pickle')
+
+        parsed = _load_logging_config_file(self.configpath, self.logdir)
+        _load_logging_config_file(self.configpath, self.logdir)
+
+        self.assertEqual(parsed[0]['root']['handlers'], ['console'])
+        self.assertEqual(self.mock_parse.call_count, 1)
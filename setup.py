@@ -6,6 +6,7 @@ from os import path
 from os import chdir
 from os import popen
 import time
+from pprint import pformat
 # To use a consistent encoding
 from codecs import open
 # Always prefer setuptools over distutils
@@ -55,6 +56,21 @@ with open(path.join(here, fname), 'w') as f:
     f.write("COMMIT_ID = '{}'\n".format(commit_id))
     f.write("BUILD_DATE = '{}'\n".format(time.strftime("%Y-%m-%d %H:%M:%S %z")))
 
+# Create a "_logging_config.py" file in the package from the logging config YAML file
+# so that the CLI does not have to parse YAML on every invocation
+try:
+    import yaml
+except ImportError:
+    # The CLI will fall back to parsing the logging config YAML file at runtime
+    print("PyYAML not found, {}/_logging_config.py not generated".format(name))
+else:
+    with open(path.join(here, name, 'logging.yaml'), 'rb') as f:
+        logging_config = yaml.safe_load(f.read().decode("utf-8"))
+    fname = "{}/_logging_config.py".format(name)
+    with open(path.join(here, fname), 'w') as f:
+        f.write("\"\"\" This file was generated from logging.yaml when {} was built \"\"\"\n".format(name))
+        f.write("CONFIG = {}\n".format(pformat(logging_config)))
+
 # Read in requirements (dependencies) file
 with open('requirements.txt') as f:
     install_requires = f.read()